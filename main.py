@@ -7,19 +7,25 @@ Usage:
 
 Env (.env):
   SUPERSET_URL, SUPERSET_USERNAME, SUPERSET_PASSWORD,
-  SUPERSET_LOGIN_PROVIDER, RLS_JSON, VERIFY_SSL
+  SUPERSET_LOGIN_PROVIDER, RLS_JSON, VERIFY_SSL, CORS_ORIGINS,
+  SUPERSET_MAX_INFLIGHT
 """
 
+import asyncio
 import json
 import os
-from typing import List, Optional
+import re
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar, Union
 from urllib.parse import urlparse
 
-import requests
+import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 import uvicorn
 
@@ -33,16 +39,8 @@ app = FastAPI(
     description=(
         "API for generating Superset guest tokens for embedded dashboards"
     ),
-    version="1.0.0"
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for development
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["*"],
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Pydantic models
@@ -63,6 +61,19 @@ class GuestTokenRequest(BaseModel):
     )
 
 
+# Upper bound on items per /generate-tokens call
+MAX_BATCH_SIZE = 50
+
+
+class BatchGuestTokenRequest(BaseModel):
+    requests: List[GuestTokenRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Guest token requests, one per dashboard (at most {MAX_BATCH_SIZE})"
+    )
+
+
 class GuestTokenResponse(BaseModel):
     token: str
     dashboard_uuid: str
@@ -73,6 +84,14 @@ class ErrorResponse(BaseModel):
     error: str
     detail: str
 
+
+class SupersetAuthError(HTTPException):
+    """Superset rejected the access token (HTTP 401); it should be refreshed"""
+
+
+class SupersetCSRFError(SupersetAuthError):
+    """Superset rejected the CSRF token (HTTP 400); it should be refetched"""
+
 # Configuration
 
 
@@ -84,59 +103,149 @@ class Config:
     VERIFY_SSL = os.getenv("VERIFY_SSL", "true").lower() in {
         "1", "true", "yes", "y", "on"}
     RLS_JSON = os.getenv("RLS_JSON", "[]")
+    # Comma-separated list of browser origins allowed to call the API
+    CORS_ORIGINS = [
+        origin.strip()
+        for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+        if origin.strip()
+    ]
+    SUPERSET_MAX_INFLIGHT = os.getenv("SUPERSET_MAX_INFLIGHT", "32")
+    # SUPERSET_MAX_INFLIGHT parsed and range-checked, set by validate()
+    MAX_INFLIGHT = 32
+    # SUPERSET_URL without a trailing slash, set by validate()
+    BASE = None
+    # RLS_JSON parsed once (left as the original string), set by validate()
+    RLS_PARSED = ()
+    # RLS_PARSED encoded once for guest_token payloads, set by validate()
+    RLS_BYTES = b"[]"
+
+    _validated = False
 
     @classmethod
     def validate(cls):
+        """Validate settings once; later calls are a no-op."""
+        if cls._validated:
+            return
+
         if not cls.SUPERSET_URL or not cls.SUPERSET_USERNAME or not cls.SUPERSET_PASSWORD:
             raise HTTPException(
                 status_code=500,
                 detail="Missing environment variables. Set SUPERSET_URL, SUPERSET_USERNAME, SUPERSET_PASSWORD in .env"
             )
 
-        # Parse RLS as JSON array if it's a string
-        if isinstance(cls.RLS_JSON, str):
-            try:
-                cls.RLS_JSON = json.loads(cls.RLS_JSON)
-            except json.JSONDecodeError as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"RLS_JSON is not valid JSON: {e}"
-                )
+        # Parse RLS as JSON array
+        try:
+            rls = json.loads(cls.RLS_JSON)
+        except json.JSONDecodeError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"RLS_JSON is not valid JSON: {e}"
+            )
 
-        if not isinstance(cls.RLS_JSON, list):
+        if not isinstance(rls, list):
             raise HTTPException(
                 status_code=500,
                 detail="RLS_JSON must be a JSON array, e.g. [] or [{\"clause\":\"tenant_id='acme'\"}]"
             )
 
+        try:
+            max_inflight = int(cls.SUPERSET_MAX_INFLIGHT)
+        except ValueError:
+            raise HTTPException(
+                status_code=500,
+                detail=f"SUPERSET_MAX_INFLIGHT must be an integer, got '{cls.SUPERSET_MAX_INFLIGHT}'"
+            )
+
+        if max_inflight < 1:
+            raise HTTPException(
+                status_code=500,
+                detail="SUPERSET_MAX_INFLIGHT must be at least 1"
+            )
+
+        cls.MAX_INFLIGHT = max_inflight
+        cls.RLS_PARSED = tuple(rls)
+        cls.RLS_BYTES = orjson.dumps(cls.RLS_PARSED)
+        cls.BASE = cls.SUPERSET_URL.rstrip("/")
+        cls._validated = True
+
+    @classmethod
+    def rls_bytes(cls, rls: Optional[list]) -> bytes:
+        """Encode request RLS rules, or return the pre-encoded default"""
+        return cls.RLS_BYTES if rls is None else orjson.dumps(rls)
+
+
+# Add CORS middleware; it also answers preflight (OPTIONS) requests.
+# Wildcard origins are invalid with credentials, so list them explicitly.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=Config.CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["POST", "OPTIONS"],
+    allow_headers=["*"],
+)
+
 # Utility functions
 
+# Request bodies are pre-encoded with orjson rather than httpx's json=
+JSON_HEADERS = {"Content-Type": "application/json"}
 
-def http_error_detail(resp: requests.Response) -> str:
-    try:
-        return resp.text
-    except Exception:
-        return f"status={resp.status_code}"
+
+@lru_cache(maxsize=16)
+def auth_headers(access_token: str) -> Dict[str, str]:
+    """Bearer header dict, reused while the access token is cached.
+    Callers must not mutate the returned dict."""
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+# Upstream error bodies (often full HTML pages) are truncated to this size
+ERROR_DETAIL_LIMIT = 4096
+
+
+# Caps concurrent requests to Superset per worker; created in startup()
+_upstream_sema: Optional[asyncio.Semaphore] = None
+
+
+async def upstream(client: httpx.AsyncClient, method: str, url: str,
+                   **kwargs) -> httpx.Response:
+    """Send a request to Superset, waiting for a free in-flight slot."""
+    if _upstream_sema is None:
+        raise RuntimeError(
+            "Upstream semaphore not initialised; the startup hook has not run")
+    async with _upstream_sema:
+        return await client.request(method, url, **kwargs)
+
+
+def http_error_detail(resp: httpx.Response) -> str:
+    if resp.content:
+        return resp.content[:ERROR_DETAIL_LIMIT].decode("utf-8", "replace")
+    return f"status={resp.status_code}"
 
 
-def login(session: requests.Session, base: str, username: str,
-          password: str, provider: str, verify=True) -> str:
-    r = session.post(
+def batch_error(exc: BaseException) -> dict:
+    """Per-item ErrorResponse body, shaped like the exception handlers"""
+    if isinstance(exc, HTTPException):
+        return {"error": "HTTP Error", "detail": str(exc.detail)}
+    return {"error": "Internal Server Error", "detail": str(exc)}
+
+
+async def login(client: httpx.AsyncClient, base: str, username: str,
+                password: str, provider: str) -> str:
+    r = await upstream(
+        client, "POST",
         f"{base}/api/v1/security/login",
-        json={
+        content=orjson.dumps({
             "username": username,
             "password": password,
             "provider": provider,
-            "refresh": False},
-        timeout=20,
-        verify=verify,
+            "refresh": False}),
+        headers=JSON_HEADERS,
     )
     if r.status_code != 200:
         raise HTTPException(
             status_code=400,
             detail=f"Login failed ({r.status_code}): {http_error_detail(r)}"
         )
-    data = r.json()
+    data = orjson.loads(r.content)
     token = data.get("access_token")
     if not token:
         raise HTTPException(
@@ -145,20 +254,20 @@ def login(session: requests.Session, base: str, username: str,
     return token
 
 
-def get_csrf(session: requests.Session, base: str,
-             access_token: str, verify=True) -> str:
-    r = session.get(
+async def get_csrf(client: httpx.AsyncClient, base: str,
+                   access_token: str) -> str:
+    r = await upstream(
+        client, "GET",
         f"{base}/api/v1/security/csrf_token/",
-        headers={"Authorization": f"Bearer {access_token}"},
-        timeout=20,
-        verify=verify,
+        headers=auth_headers(access_token),
     )
     if r.status_code != 200:
-        raise HTTPException(
+        error = SupersetAuthError if r.status_code == 401 else HTTPException
+        raise error(
             status_code=400,
             detail=f"Fetching CSRF failed ({r.status_code}): {http_error_detail(r)}"
         )
-    data = r.json()
+    data = orjson.loads(r.content)
     csrf = data.get("result")
     if not csrf:
         raise HTTPException(status_code=400,
@@ -166,6 +275,115 @@ def get_csrf(session: requests.Session, base: str,
     return csrf
 
 
+_UUID_RE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I)
+
+# Superset access/CSRF tokens are reused across requests until they expire
+_token_cache = TTLCache(maxsize=8, ttl=300)
+_csrf_cache = TTLCache(maxsize=8, ttl=600)
+# In-flight login/CSRF fetches, shared by concurrent cold-cache requests
+_login_inflight: Dict[tuple, asyncio.Future] = {}
+_csrf_inflight: Dict[tuple, asyncio.Future] = {}
+
+# Dashboard UUIDs do not change, so numeric ID lookups are cached for longer
+_uuid_cache = TTLCache(maxsize=1024, ttl=3600)
+# (uuid, ETag) pairs outlive the TTL so expired entries can be revalidated
+# with a conditional GET instead of a full dashboard fetch
+_uuid_etags = LRUCache(maxsize=1024)
+
+T = TypeVar("T")
+
+
+def _token_key(config) -> tuple:
+    return (config.SUPERSET_URL, config.SUPERSET_USERNAME,
+            config.SUPERSET_LOGIN_PROVIDER)
+
+
+async def _singleflight(inflight: Dict[tuple, asyncio.Future], key: tuple,
+                        fetch: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run fetch() at most once per key at a time. Concurrent callers await the
+    same task instead of issuing their own upstream request.
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        inflight[key] = task
+
+        def _done(_):
+            if inflight.get(key) is task:
+                del inflight[key]
+            # Mark the exception retrieved in case every waiter was cancelled
+            if not task.cancelled():
+                task.exception()
+
+        task.add_done_callback(_done)
+    # shield: a cancelled caller must not cancel the fetch other callers share
+    return await asyncio.shield(task)
+
+
+async def get_access_token(client: httpx.AsyncClient, base: str,
+                           config) -> str:
+    """Return a cached access token, logging in only when none is cached."""
+    key = _token_key(config)
+    token = _token_cache.get(key)
+    if token:
+        return token
+
+    async def fetch() -> str:
+        token = await login(
+            client, base, config.SUPERSET_USERNAME,
+            config.SUPERSET_PASSWORD, config.SUPERSET_LOGIN_PROVIDER
+        )
+        _token_cache[key] = token
+        return token
+
+    return await _singleflight(_login_inflight, key, fetch)
+
+
+async def get_csrf_token(client: httpx.AsyncClient, base: str, config,
+                         access_token: str) -> str:
+    """Return a cached CSRF token, fetching one only when none is cached."""
+    key = _token_key(config)
+    csrf = _csrf_cache.get(key)
+    if csrf:
+        return csrf
+
+    async def fetch() -> str:
+        csrf = await get_csrf(client, base, access_token)
+        _csrf_cache[key] = csrf
+        return csrf
+
+    # Keyed by access token too, so a retry after a 401 never joins a fetch
+    # that is still using the rejected token
+    return await _singleflight(_csrf_inflight, key + (access_token,), fetch)
+
+
+def invalidate_tokens(config) -> None:
+    key = _token_key(config)
+    _token_cache.pop(key, None)
+    _csrf_cache.pop(key, None)
+
+
+async def with_access_token(client: httpx.AsyncClient, base: str, config,
+                            fn: Callable[[str], Awaitable[T]]) -> T:
+    """
+    Call fn(access_token) with the cached token. If Superset answers 401 the
+    cached tokens are dropped and fn is retried once after a fresh login; if
+    it rejects the CSRF token, only that is dropped and refetched.
+    """
+    access_token = await get_access_token(client, base, config)
+    try:
+        return await fn(access_token)
+    except SupersetCSRFError:
+        _csrf_cache.pop(_token_key(config), None)
+        return await fn(access_token)
+    except SupersetAuthError:
+        invalidate_tokens(config)
+        access_token = await get_access_token(client, base, config)
+        return await fn(access_token)
+
+
 def extract_candidate_from_url(dash_arg: str) -> str:
     """If a full URL is passed, return the last non-empty path segment."""
     try:
@@ -179,8 +397,8 @@ def extract_candidate_from_url(dash_arg: str) -> str:
     return dash_arg
 
 
-def resolve_dashboard_uuid(session: requests.Session, base: str,
-                           access_token: str, dash_arg: str, verify=True) -> str:
+async def resolve_dashboard_uuid(client: httpx.AsyncClient, base: str,
+                                 access_token: str, dash_arg: str) -> str:
     """
     Accepts:
       - UUID (xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx) -> returns as-is
@@ -189,80 +407,152 @@ def resolve_dashboard_uuid(session: requests.Session, base: str,
     """
     candidate = extract_candidate_from_url(dash_arg).strip()
 
-    # UUID heuristic
-    if len(candidate) == 36 and candidate.count("-") == 4:
-        return candidate
+    if _UUID_RE.fullmatch(candidate):
+        return candidate.lower()
+
+    key = (base, candidate)
+    cached = _uuid_cache.get(key)
+    if cached:
+        return cached
+
+    headers = auth_headers(access_token)
+    validator = _uuid_etags.get(key)
+    if validator:
+        headers = {**headers, "If-None-Match": validator[1]}
 
     # Assume numeric id
-    r = session.get(
+    r = await upstream(
+        client, "GET",
         f"{base}/api/v1/dashboard/{candidate}",
-        headers={"Authorization": f"Bearer {access_token}"},
-        timeout=20,
-        verify=verify,
+        headers=headers,
     )
+    if r.status_code == 304 and validator:
+        _uuid_cache[key] = validator[0]
+        return validator[0]
     if r.status_code != 200:
-        raise HTTPException(
+        error = SupersetAuthError if r.status_code == 401 else HTTPException
+        raise error(
             status_code=400,
             detail=f"Could not resolve dashboard UUID from '{dash_arg}' ({r.status_code}): {http_error_detail(r)}"
         )
-    data = r.json().get("result") or {}
+    data = orjson.loads(r.content).get("result") or {}
     uuid = data.get("uuid")
     if not uuid:
         raise HTTPException(
             status_code=400,
             detail=f"Dashboard lookup returned no 'uuid' for '{dash_arg}'."
         )
+    _uuid_cache[key] = uuid
+    etag = r.headers.get("ETag")
+    if etag:
+        _uuid_etags[key] = (uuid, etag)
+    else:
+        _uuid_etags.pop(key, None)
     return uuid
 
 
-def generate_guest_token(
-    session: requests.Session,
+async def generate_guest_token(
+    client: httpx.AsyncClient,
     base: str,
     access_token: str,
     csrf_token: str,
     dashboard_uuid: str,
-    rls: list,
+    rls_json: bytes,
     username: str = "guest_via_api",
-    verify=True,
 ) -> str:
-    payload = {
-        "resources": [{"type": "dashboard", "id": dashboard_uuid}],
-        "user": {"username": username},
-        "rls": rls,
-    }
+    """rls_json is the already-encoded RLS array, e.g. Config.RLS_BYTES"""
+    # Splice the variable fields into the constant payload skeleton:
+    # {"resources": [{"type": "dashboard", "id": ...}],
+    #  "user": {"username": ...}, "rls": [...]}
+    payload = b"".join((
+        b'{"resources":[{"type":"dashboard","id":',
+        orjson.dumps(dashboard_uuid),
+        b'}],"user":{"username":',
+        orjson.dumps(username),
+        b'},"rls":',
+        rls_json,
+        b"}",
+    ))
     headers = {
-        "Authorization": f"Bearer {access_token}",
+        **auth_headers(access_token),
         "X-CSRFToken": csrf_token,
         "Referer": base,
+        **JSON_HEADERS,
     }
-    r = session.post(
+    r = await upstream(
+        client, "POST",
         f"{base}/api/v1/security/guest_token/",
-        json=payload,
+        content=payload,
         headers=headers,
-        timeout=20,
-        verify=verify,
     )
     if r.status_code != 200:
-        raise HTTPException(
+        detail = http_error_detail(r)
+        if r.status_code == 401:
+            error = SupersetAuthError
+        elif r.status_code == 400 and "csrf" in detail.lower():
+            # Flask-WTF: stale token or lost session cookie
+            error = SupersetCSRFError
+        else:
+            error = HTTPException
+        raise error(
             status_code=400,
-            detail=f"guest_token request failed ({r.status_code}): {http_error_detail(r)}"
+            detail=f"guest_token request failed ({r.status_code}): {detail}"
         )
-    data = r.json()
+    data = orjson.loads(r.content)
     token = data.get("token")
     if not token:
         raise HTTPException(status_code=400,
                             detail="guest_token response missing 'token'")
     return token
 
-# Dependency to validate configuration
+# Dependencies
 
 
 def get_config():
+    Config.validate()
+    return Config
+
+
+def get_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.client
+
+# Application lifecycle
+
+
+@app.on_event("startup")
+async def startup():
+    """Validate configuration and create the shared upstream HTTP client"""
     try:
         Config.validate()
-        return Config
     except HTTPException:
-        raise
+        # Keep serving; get_config reports the problem on each request
+        pass
+
+    # One keep-alive pool reused by every request; connection failures are
+    # retried at the transport level before surfacing to the handler.
+    # HTTP/2 is negotiated via ALPN and falls back to HTTP/1.1 if Superset
+    # (or its proxy) does not offer h2.
+    transport = httpx.AsyncHTTPTransport(
+        verify=Config.VERIFY_SSL,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=64,
+                            max_connections=100,
+                            keepalive_expiry=60),
+        retries=2,
+    )
+    app.state.client = httpx.AsyncClient(transport=transport, timeout=20)
+
+    # Bound outbound concurrency so bursts queue here, not inside Superset.
+    # MAX_INFLIGHT keeps its default if validation failed above; requests
+    # are then rejected by get_config before reaching upstream().
+    global _upstream_sema
+    _upstream_sema = asyncio.Semaphore(Config.MAX_INFLIGHT)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the shared upstream HTTP client"""
+    await app.state.client.aclose()
 
 # API endpoints
 
@@ -278,12 +568,6 @@ async def root():
     }
 
 
-@app.options("/generate-token")
-async def options_generate_token():
-    """Handle preflight CORS request"""
-    return {"message": "OK"}
-
-
 @app.get("/health", response_model=dict)
 async def health_check():
     """Health check endpoint"""
@@ -293,48 +577,124 @@ async def health_check():
 @app.post("/generate-token", response_model=GuestTokenResponse)
 async def generate_guest_token_endpoint(
     request: GuestTokenRequest,
-    config: Config = Depends(get_config)
+    config: Config = Depends(get_config),
+    client: httpx.AsyncClient = Depends(get_client)
 ):
     """Generate a guest token for embedding a Superset dashboard"""
     try:
-        # Trim trailing slash on base URL
-        base = config.SUPERSET_URL[:-1] if config.SUPERSET_URL.endswith("/") else config.SUPERSET_URL
+        base = config.BASE
 
         # Use provided RLS or fall back to environment variable
-        rls = request.rls if request.rls is not None else config.RLS_JSON
-
-        with requests.Session() as session:
-            # Login and get access token
-            access_token = login(
-                session, base, config.SUPERSET_USERNAME,
-                config.SUPERSET_PASSWORD, config.SUPERSET_LOGIN_PROVIDER,
-                verify=config.VERIFY_SSL
-            )
-
-            # Get CSRF token
-            csrf_token = get_csrf(
-                session,
-                base,
-                access_token,
-                verify=config.VERIFY_SSL)
-
-            # Resolve dashboard UUID
-            dashboard_uuid = resolve_dashboard_uuid(
-                session, base, access_token, request.dashboard,
-                verify=config.VERIFY_SSL
+        rls_json = config.rls_bytes(request.rls)
+
+        async def issue(access_token: str):
+            # CSRF token and dashboard UUID only depend on the access token
+            csrf_token, dashboard_uuid = await asyncio.gather(
+                get_csrf_token(client, base, config, access_token),
+                resolve_dashboard_uuid(
+                    client, base, access_token, request.dashboard)
             )
 
             # Generate guest token
-            token = generate_guest_token(
-                session, base, access_token, csrf_token,
-                dashboard_uuid, rls, request.username, verify=config.VERIFY_SSL
+            token = await generate_guest_token(
+                client, base, access_token, csrf_token,
+                dashboard_uuid, rls_json, request.username
             )
+            return token, dashboard_uuid
+
+        token, dashboard_uuid = await with_access_token(
+            client, base, config, issue)
+
+        # Plain dict response: response_model only documents the schema
+        return ORJSONResponse({
+            "token": token,
+            "dashboard_uuid": dashboard_uuid,
+            "message": "Guest token generated successfully"
+        })
 
-            return GuestTokenResponse(
-                token=token,
-                dashboard_uuid=dashboard_uuid,
-                message="Guest token generated successfully"
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+@app.post("/generate-tokens",
+          response_model=List[Union[GuestTokenResponse, ErrorResponse]])
+async def generate_guest_tokens_endpoint(
+    body: BatchGuestTokenRequest,
+    config: Config = Depends(get_config),
+    client: httpx.AsyncClient = Depends(get_client)
+):
+    """
+    Generate guest tokens for several dashboards with a single Superset login.
+    Results keep the request order; a failed item is returned as an error
+    object instead of failing the whole batch. If Superset rejects the access
+    token, only the rejected items are retried once after a fresh login;
+    items rejected again are returned as errors.
+    """
+    try:
+        base = config.BASE
+
+        async def issue_one(item: GuestTokenRequest, access_token: str,
+                            csrf_token: str) -> dict:
+            rls_json = config.rls_bytes(item.rls)
+            dashboard_uuid = await resolve_dashboard_uuid(
+                client, base, access_token, item.dashboard)
+            token = await generate_guest_token(
+                client, base, access_token, csrf_token,
+                dashboard_uuid, rls_json, item.username
             )
+            return {
+                "token": token,
+                "dashboard_uuid": dashboard_uuid,
+                "message": "Guest token generated successfully"
+            }
+
+        results: list = [None] * len(body.requests)
+        attempts = 0
+
+        async def issue(access_token: str):
+            nonlocal attempts
+            attempts += 1
+            retrying = attempts > 1
+            # On a retry after a 401 only the items that were rejected are
+            # re-issued; tokens already generated are kept.
+            pending = [
+                i for i, result in enumerate(results)
+                if result is None or isinstance(result, SupersetAuthError)
+            ]
+            try:
+                csrf_token = await get_csrf_token(
+                    client, base, config, access_token)
+            except SupersetAuthError as e:
+                if not retrying:
+                    raise
+                issued = [e] * len(pending)
+            else:
+                issued = await asyncio.gather(
+                    *[issue_one(body.requests[i], access_token, csrf_token)
+                      for i in pending],
+                    return_exceptions=True
+                )
+            for i, result in zip(pending, issued):
+                results[i] = result
+            # Let with_access_token refresh the token and call us once more;
+            # rejections left after that retry stay per-item errors.
+            if not retrying:
+                for result in issued:
+                    if isinstance(result, SupersetAuthError):
+                        raise result
+            return results
+
+        results = await with_access_token(client, base, config, issue)
+
+        return ORJSONResponse([
+            batch_error(result) if isinstance(result, BaseException) else result
+            for result in results
+        ])
 
     except HTTPException:
         raise
@@ -348,29 +708,24 @@ async def generate_guest_token_endpoint(
 @app.get("/dashboard/{dashboard_id}", response_model=dict)
 async def get_dashboard_info(
     dashboard_id: str,
-    config: Config = Depends(get_config)
+    config: Config = Depends(get_config),
+    client: httpx.AsyncClient = Depends(get_client)
 ):
     """Get information about a specific dashboard"""
     try:
-        base = config.SUPERSET_URL[:-1] if config.SUPERSET_URL.endswith("/") else config.SUPERSET_URL
-
-        with requests.Session() as session:
-            access_token = login(
-                session, base, config.SUPERSET_USERNAME,
-                config.SUPERSET_PASSWORD, config.SUPERSET_LOGIN_PROVIDER,
-                verify=config.VERIFY_SSL
-            )
+        base = config.BASE
 
-            dashboard_uuid = resolve_dashboard_uuid(
-                session, base, access_token, dashboard_id,
-                verify=config.VERIFY_SSL
-            )
+        dashboard_uuid = await with_access_token(
+            client, base, config,
+            lambda access_token: resolve_dashboard_uuid(
+                client, base, access_token, dashboard_id)
+        )
 
-            return {
-                "dashboard_id": dashboard_id,
-                "dashboard_uuid": dashboard_uuid,
-                "message": "Dashboard UUID resolved successfully"
-            }
+        return {
+            "dashboard_id": dashboard_id,
+            "dashboard_uuid": dashboard_uuid,
+            "message": "Dashboard UUID resolved successfully"
+        }
 
     except HTTPException:
         raise
@@ -385,12 +740,28 @@ async def get_dashboard_info(
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return {"error": "HTTP Error", "detail": exc.detail}
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"error": "HTTP Error", "detail": exc.detail},
+    )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
-    return {"error": "Internal Server Error", "detail": str(exc)}
+    return ORJSONResponse(
+        status_code=500,
+        content={"error": "Internal Server Error", "detail": str(exc)},
+    )
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # "auto" picks uvloop/httptools when installed (uvicorn[standard] on
+    # CPython, non-Windows). Each worker process runs the startup hook and
+    # owns its own upstream client, caches and SUPERSET_MAX_INFLIGHT limit.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
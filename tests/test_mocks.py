@@ -0,0 +1,267 @@
+"""
+Tests against a mocked Superset (httpx.MockTransport).
+
+Covers the upstream caching and retry paths: login coalescing, token
+refresh after a 401 or CSRF rejection, ETag revalidation of dashboard
+UUIDs, the in-flight semaphore and per-item batch errors.
+"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+import main
+
+DASHBOARD_UUID = "b713fcc3-167a-4961-ac21-2fa7e851b514"
+
+
+class FakeSuperset:
+    """Minimal Superset API; tests override the per-endpoint handlers."""
+
+    def __init__(self):
+        self.logins = 0
+        self.csrf_fetches = 0
+        self.requests = []
+        self.inflight = 0
+        self.max_inflight = 0
+        self.dashboard = self.dashboard_ok
+        self.guest_token = self.guest_token_ok
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            # Yield so concurrent callers overlap while a request is "in flight"
+            await asyncio.sleep(0.01)
+            path = request.url.path
+            if path == "/api/v1/security/login":
+                self.logins += 1
+                return httpx.Response(
+                    200, json={"access_token": f"access-{self.logins}"})
+            if path == "/api/v1/security/csrf_token/":
+                self.csrf_fetches += 1
+                return httpx.Response(
+                    200, json={"result": f"csrf-{self.csrf_fetches}"})
+            if path.startswith("/api/v1/dashboard/"):
+                return self.dashboard(request)
+            if path == "/api/v1/security/guest_token/":
+                return self.guest_token(request)
+            return httpx.Response(404)
+        finally:
+            self.inflight -= 1
+
+    def dashboard_ok(self, request):
+        return httpx.Response(200, json={"result": {"uuid": DASHBOARD_UUID}})
+
+    def guest_token_ok(self, request):
+        dashboard = orjson.loads(request.content)["resources"][0]["id"]
+        return httpx.Response(200, json={"token": f"guest-{dashboard}"})
+
+    def paths(self, path):
+        return [r for r in self.requests if r.url.path == path]
+
+
+@pytest.fixture(autouse=True)
+def superset_config(monkeypatch):
+    """Validated Config, empty caches and a fresh semaphore for each test."""
+    for name in ("BASE", "RLS_PARSED", "RLS_BYTES", "MAX_INFLIGHT"):
+        monkeypatch.setattr(main.Config, name, getattr(main.Config, name))
+    monkeypatch.setattr(main.Config, "SUPERSET_URL", "https://superset.test/")
+    monkeypatch.setattr(main.Config, "SUPERSET_USERNAME", "admin")
+    monkeypatch.setattr(main.Config, "SUPERSET_PASSWORD", "secret")
+    monkeypatch.setattr(main.Config, "RLS_JSON", "[]")
+    monkeypatch.setattr(main.Config, "SUPERSET_MAX_INFLIGHT", "32")
+    monkeypatch.setattr(main.Config, "_validated", False)
+    main.Config.validate()
+    monkeypatch.setattr(main, "_upstream_sema", asyncio.Semaphore(32))
+
+    for cache in (main._token_cache, main._csrf_cache, main._uuid_cache,
+                  main._uuid_etags, main._login_inflight, main._csrf_inflight):
+        cache.clear()
+    main.auth_headers.cache_clear()
+
+
+@pytest.fixture
+def superset():
+    return FakeSuperset()
+
+
+def run(superset, fn):
+    """Run fn(client) on a client wired to the fake Superset."""
+    async def runner():
+        transport = httpx.MockTransport(superset)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await fn(client)
+    return asyncio.run(runner())
+
+
+def response_json(response):
+    return orjson.loads(response.body)
+
+
+def test_cold_burst_logs_in_once(superset):
+    async def burst(client):
+        return await asyncio.gather(*[
+            main.get_access_token(client, main.Config.BASE, main.Config)
+            for _ in range(20)
+        ])
+
+    tokens = run(superset, burst)
+
+    assert tokens == ["access-1"] * 20
+    assert superset.logins == 1
+
+
+def test_cached_tokens_are_reused_across_requests(superset):
+    async def two_requests(client):
+        request = main.GuestTokenRequest(dashboard=DASHBOARD_UUID)
+        for _ in range(2):
+            await main.generate_guest_token_endpoint(
+                request, config=main.Config, client=client)
+
+    run(superset, two_requests)
+
+    assert superset.logins == 1
+    assert superset.csrf_fetches == 1
+
+
+def test_401_refreshes_access_token_and_retries(superset):
+    def reject_first_token(request):
+        if request.headers["Authorization"] == "Bearer access-1":
+            return httpx.Response(401, json={"msg": "Token has expired"})
+        return superset.guest_token_ok(request)
+
+    superset.guest_token = reject_first_token
+
+    async def generate(client):
+        return await main.generate_guest_token_endpoint(
+            main.GuestTokenRequest(dashboard=DASHBOARD_UUID),
+            config=main.Config, client=client)
+
+    body = response_json(run(superset, generate))
+
+    assert body["token"] == f"guest-{DASHBOARD_UUID}"
+    assert superset.logins == 2
+    assert main._token_cache[main._token_key(main.Config)] == "access-2"
+
+
+def test_rejected_csrf_token_is_refetched(superset):
+    def reject_first_csrf(request):
+        if request.headers["X-CSRFToken"] == "csrf-1":
+            return httpx.Response(
+                400, text="400 Bad Request: The CSRF token has expired.")
+        return superset.guest_token_ok(request)
+
+    superset.guest_token = reject_first_csrf
+
+    async def generate(client):
+        return await main.generate_guest_token_endpoint(
+            main.GuestTokenRequest(dashboard=DASHBOARD_UUID),
+            config=main.Config, client=client)
+
+    body = response_json(run(superset, generate))
+
+    assert body["token"] == f"guest-{DASHBOARD_UUID}"
+    assert superset.csrf_fetches == 2
+    assert superset.logins == 1
+    assert main._csrf_cache[main._token_key(main.Config)] == "csrf-2"
+
+
+def test_304_reuses_cached_dashboard_uuid(superset):
+    def dashboard(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200, json={"result": {"uuid": DASHBOARD_UUID}},
+            headers={"ETag": '"v1"'})
+
+    superset.dashboard = dashboard
+
+    async def resolve_twice(client):
+        first = await main.resolve_dashboard_uuid(
+            client, main.Config.BASE, "access-1", "42")
+        # Simulate the UUID TTL expiring; the ETag entry outlives it
+        main._uuid_cache.clear()
+        second = await main.resolve_dashboard_uuid(
+            client, main.Config.BASE, "access-1", "42")
+        return first, second
+
+    assert run(superset, resolve_twice) == (DASHBOARD_UUID, DASHBOARD_UUID)
+
+    lookups = superset.paths("/api/v1/dashboard/42")
+    assert len(lookups) == 2
+    assert "If-None-Match" not in lookups[0].headers
+    assert lookups[1].headers["If-None-Match"] == '"v1"'
+    assert main._uuid_cache[(main.Config.BASE, "42")] == DASHBOARD_UUID
+
+
+def test_semaphore_bounds_upstream_concurrency(superset, monkeypatch):
+    monkeypatch.setattr(main, "_upstream_sema", asyncio.Semaphore(3))
+
+    async def lookups(client):
+        return await asyncio.gather(*[
+            main.resolve_dashboard_uuid(
+                client, main.Config.BASE, "access-1", str(i))
+            for i in range(10)
+        ])
+
+    assert run(superset, lookups) == [DASHBOARD_UUID] * 10
+    assert superset.max_inflight == 3
+
+
+def test_batch_returns_per_item_errors(superset):
+    def dashboard(request):
+        if request.url.path.endswith("/404"):
+            return httpx.Response(404, json={"message": "Not found"})
+        return superset.dashboard_ok(request)
+
+    superset.dashboard = dashboard
+
+    async def batch(client):
+        body = main.BatchGuestTokenRequest(requests=[
+            main.GuestTokenRequest(dashboard=DASHBOARD_UUID),
+            main.GuestTokenRequest(dashboard="404"),
+        ])
+        return await main.generate_guest_tokens_endpoint(
+            body, config=main.Config, client=client)
+
+    results = response_json(run(superset, batch))
+
+    assert results[0]["token"] == f"guest-{DASHBOARD_UUID}"
+    assert results[1]["error"] == "HTTP Error"
+    assert "(404)" in results[1]["detail"]
+    assert superset.logins == 1
+
+
+def test_batch_keeps_tokens_when_an_item_is_rejected_after_refresh(superset):
+    other_uuid = "c0ffee00-0000-4000-8000-000000000001"
+
+    def reject_other_dashboard(request):
+        if orjson.loads(request.content)["resources"][0]["id"] == other_uuid:
+            return httpx.Response(401, json={"msg": "Not authorized"})
+        return superset.guest_token_ok(request)
+
+    superset.guest_token = reject_other_dashboard
+
+    async def batch(client):
+        body = main.BatchGuestTokenRequest(requests=[
+            main.GuestTokenRequest(dashboard=DASHBOARD_UUID),
+            main.GuestTokenRequest(dashboard=other_uuid),
+        ])
+        return await main.generate_guest_tokens_endpoint(
+            body, config=main.Config, client=client)
+
+    results = response_json(run(superset, batch))
+
+    assert results[0]["token"] == f"guest-{DASHBOARD_UUID}"
+    assert results[1]["error"] == "HTTP Error"
+    assert "(401)" in results[1]["detail"]
+    # One refresh, and the successful item was not re-issued
+    assert superset.logins == 2
+    issued = [orjson.loads(r.content)["resources"][0]["id"]
+              for r in superset.paths("/api/v1/security/guest_token/")]
+    assert issued.count(DASHBOARD_UUID) == 1
+    assert issued.count(other_uuid) == 2